@@ -4,120 +4,411 @@
 Показывает, на каких продах присутствует указанный сервис.
 """
 
+import os
+import io
+import csv
 import sys
+import mmap
+import pickle
+import hashlib
+import heapq
 import argparse
 import re
-from typing import Dict, Set, List, Tuple
+import string
+from typing import Dict, Set, List, Tuple, Optional, Pattern
 from pathlib import Path
-from collections import defaultdict
+from array import array
+from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, partial
+
+
+YML_EXTENSIONS = ('.yml', '.yaml')
+
+# Регулярные выражения компилируются один раз при загрузке модуля
+YML_EXT_PATTERN = re.compile(r'\.(yml|yaml)$', re.IGNORECASE)
+ACTIVE_PROFILES_PATTERN = re.compile(r'^(\s*active_profiles:\s*)(.*)$')
+# Непустая строка без комментария, заканчивающаяся на ':' (ключ без значения)
+KEY_LINE_PATTERN = re.compile(rb'^[^\S\n]*(?:[^\s#].*)?:[^\S\n]*$', re.MULTILINE)
+
+# Файлы разбираются как байты: множества содержат коды символов (int)
+SERVICE_NAME_CHARS = frozenset((string.ascii_letters + string.digits + '_-').encode('ascii'))
+WHITESPACE_CHARS = frozenset(string.whitespace.encode('ascii'))
+
+# С какого количества файлов имеет смысл запускать пул процессов
+PARALLEL_SCAN_MIN_FILES = 32
+
+# Версия формата кэша разбора; увеличивать при изменении записей parse_services
+SCAN_CACHE_VERSION = 1
+
+
+def parse_service_line(line: bytes, indent: int) -> Optional[str]:
+    """
+    Разбирает строку вида '<отступ>[- ]<имя>:' и возвращает имя сервиса.
+    
+    Отступ уже посчитан вызывающим кодом, поэтому разбор начинается сразу с него:
+    один проход по байтам строки вместо регулярного выражения. В str
+    декодируется только само имя (оно всегда ASCII).
+    """
+    i = indent
+    n = len(line)
+    if i < n and line[i] == 0x2D:  # '-'
+        i += 1
+        while i < n and line[i] in WHITESPACE_CHARS:
+            i += 1
+    start = i
+    while i < n and line[i] in SERVICE_NAME_CHARS:
+        i += 1
+    if i > start and i < n and line[i] == 0x3A and not line[i + 1:].strip():  # ':'
+        return line[start:i].decode('ascii')
+    return None
+
+
+def parse_services(file_path: Path, required: Optional[Pattern[bytes]] = None
+                   ) -> Tuple[List[Tuple[str, int, int, int]], Optional[str]]:
+    """
+    Извлекает сервисы из файла.
+    
+    Функция не зависит от состояния ServiceFinder, поэтому файлы можно разбирать
+    в параллельных процессах. Возвращает записи (сервис, line_start, line_end, indent)
+    в порядке их обнаружения и текст ошибки чтения (или None) — ошибки не печатаются
+    здесь, а собираются вызывающим кодом. Если задан required, файлы без его
+    вхождения пропускаются без разбора.
+    """
+    in_services_block = False
+    services_indent = -1
+    current_service_indent = -1
+    current_service_name = None
+    current_service_start = -1
+    entries = []
+    
+    # Отображаем файл в память: поиск идёт напрямую по mmap,
+    # без копирования всего файла в список строк
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return entries, None
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        return entries, str(e)
+    
+    with mm:
+        # Файлы без блока services: пропускаем целиком одним поиском по байтам
+        header_pos = mm.find(b'services:')
+        if header_pos == -1:
+            return entries, None
+        
+        # Файл не может содержать нужных сервисов — дальше не разбираем
+        if required is not None and not required.search(mm):
+            return entries, None
+        
+        # Начинаем разбор со строки, в которой впервые встречается services:
+        pos = mm.rfind(b'\n', 0, header_pos) + 1
+        line_num = mm[:pos].count(b'\n')
+        
+        # На разбор блока services влияют только строки вида '<...>:'.
+        # Находим их одним проходом регулярного выражения по байтам файла,
+        # остальные строки (значения, пустые, комментарии) в Python не попадают
+        for key_match in KEY_LINE_PATTERN.finditer(mm, pos):
+            line_num += mm[pos:key_match.start()].count(b'\n')
+            pos = key_match.start()
+            
+            line = key_match.group()
+            stripped = line.strip()
+            
+            # Определяем уровень отступа
+            line_indent = len(line) - len(line.lstrip())
+            
+            # Ищем блок services:
+            if stripped == b'services:':
+                in_services_block = True
+                services_indent = line_indent
+                continue
+            
+            # Если мы в блоке services
+            if in_services_block:
+                # Проверяем, не вышли ли мы из блока services
+                if line_indent <= services_indent:
+                    if not stripped.startswith(b'-'):
+                        # Сохраняем предыдущий сервис
+                        if current_service_name:
+                            entries.append((current_service_name, current_service_start,
+                                            line_num - 1, current_service_indent))
+                        in_services_block = False
+                        continue
+                
+                # Ищем определение сервиса
+                service_name = parse_service_line(line, line_indent)
+                if service_name:
+                    indent = line_indent
+                    
+                    # Проверяем, что это сервис (на один уровень глубже services)
+                    if indent > services_indent:
+                        if current_service_indent == -1 or indent <= current_service_indent:
+                            # Сохраняем предыдущий сервис
+                            if current_service_name:
+                                entries.append((current_service_name, current_service_start,
+                                                line_num - 1, current_service_indent))
+                            
+                            current_service_indent = indent
+                            current_service_name = service_name
+                            current_service_start = line_num
+        
+        # Сохраняем последний сервис (он продолжается до последней строки файла)
+        last_line = line_num + mm[pos:].count(b'\n') - (mm[-1:] == b'\n')
+        if current_service_name:
+            entries.append((current_service_name, current_service_start, last_line, current_service_indent))
+    
+    return entries, None
+
+
+def prefetch_files(file_paths: List[Path]) -> None:
+    """
+    Просит ядро заранее подгрузить файлы в page cache (POSIX_FADV_WILLNEED).
+    
+    Чтение запускается асинхронно сразу для всех файлов, поэтому при холодном
+    кэше разбор не ждёт диск на каждом open/read по очереди. На системах
+    без posix_fadvise ничего не делает.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def get_cache_path(search_path: Path) -> Path:
+    """Путь к файлу кэша разбора для указанной директории."""
+    cache_root = Path(os.getenv('XDG_CACHE_HOME') or Path.home() / '.cache')
+    digest = hashlib.sha1(str(search_path.resolve()).encode('utf-8')).hexdigest()
+    return cache_root / 'find_service_on_prods' / f'{digest}.pkl'
+
+
+def load_scan_cache(cache_path: Path) -> Dict[str, Tuple[Tuple[int, int], List[Tuple[str, int, int, int]]]]:
+    """
+    Загружает кэш разбора: {путь к файлу: ((st_mtime_ns, st_size), записи parse_services)}.
+    
+    Отсутствующий, повреждённый или устаревший по формату кэш считается пустым.
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            data = pickle.load(f)
+    except Exception:
+        return {}
+    
+    if not isinstance(data, dict) or data.get('version') != SCAN_CACHE_VERSION:
+        return {}
+    return data['files']
+
+
+def save_scan_cache(cache_path: Path, files: Dict[str, Tuple[Tuple[int, int], List[Tuple[str, int, int, int]]]]) -> None:
+    """Сохраняет кэш разбора (через временный файл, чтобы не оставить его наполовину записанным)."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': SCAN_CACHE_VERSION, 'files': files}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️  Не удалось сохранить кэш {cache_path}: {e}", file=sys.stderr)
+
+
+def line_ending(line: bytes) -> bytes:
+    """Возвращает перевод строки, которым заканчивается строка (или b'')."""
+    if line.endswith(b'\r\n'):
+        return b'\r\n'
+    if line.endswith(b'\n'):
+        return b'\n'
+    return b''
+
+
+def apply_line_modifications(data: bytes, file_mods: List[Dict]) -> bytes:
+    """
+    Применяет правки add_active_profile ('update' и 'insert' по номеру строки) к содержимому файла.
+    
+    Смещения нужных строк находятся одним проходом bytes.find до самой дальней правки,
+    а результат склеивается из кусков исходных байт — файл не разбивается на список строк.
+    Правленые и вставленные строки получают тот же перевод строки, что и соседние.
+    """
+    view = memoryview(data)
+    last_line = max(mod['line_num'] for mod in file_mods) + 1
+    line_starts = [0]
+    pos = 0
+    while len(line_starts) <= last_line:
+        pos = data.find(b'\n', pos) + 1
+        if not pos:
+            break
+        line_starts.append(pos)
+    
+    def line_start(line_num: int) -> int:
+        return line_starts[line_num] if line_num < len(line_starts) else len(data)
+    
+    chunks = []
+    copied_up_to = 0
+    for mod in sorted(file_mods, key=lambda x: x['line_num']):
+        start = line_start(mod['line_num'])
+        chunks.append(view[copied_up_to:start])
+        new_line = mod['new_line'].rstrip('\n').encode('utf-8')
+        
+        if mod['action'] == 'update':
+            end = line_start(mod['line_num'] + 1)
+            eol = line_ending(data[start:end]) or b'\n'
+            copied_up_to = end
+        else:  # insert
+            eol = line_ending(data[max(start - 2, 0):start]) or b'\n'
+            if start == len(data) and data and not data.endswith(b'\n'):
+                # Последняя строка файла без перевода строки — новая строка идёт после неё
+                chunks.append(eol)
+            copied_up_to = start
+        
+        chunks.append(new_line + eol)
+    
+    chunks.append(view[copied_up_to:])
+    return b''.join(chunks)
+
+
+def top_items(items, key, top: Optional[int] = None) -> list:
+    """
+    Элементы по убыванию key; если задан top — только первые top.
+    
+    Для top используется heapq.nlargest (O(n log top)) вместо полной сортировки.
+    """
+    if top is not None:
+        return heapq.nlargest(top, items, key=key)
+    return sorted(items, key=key, reverse=True)
 
 
 class ServiceFinder:
-    def __init__(self, search_path: str, service_filter: str = None):
+    def __init__(self, search_path: str, service_filter: str = None, use_cache: bool = True):
         self.search_path = Path(search_path)
+        self.use_cache = use_cache
         self.service_filter = service_filter
-        self.services_by_prod: Dict[str, Set[str]] = defaultdict(set)  # {service: {prods}}
+        self._filter_folded = service_filter.casefold() if service_filter else None  # фильтр не меняется, приводим регистр один раз
+        self._services_folded: Dict[str, str] = {}  # {service: service.casefold()}, заполняется при сканировании
+        self._service_prod_count: Counter = Counter()  # {service: кол-во продов}, ведётся при сканировании
+        # Фильтр уже в нижнем регистре ASCII: можно сначала проверить вхождение в имя как есть
+        self._filter_ascii_lower = bool(service_filter) and service_filter.isascii() and service_filter.islower()
         self.prods_by_service: Dict[str, Set[str]] = defaultdict(set)  # {prod: {services}}
-        self.service_locations: Dict[Tuple[str, str], Dict] = {}  # {(prod, service): {file_path, line_start, line_end, indent}}
+        # Расположение сервисов хранится «структурой массивов» вместо словаря на каждый сервис:
+        # (prod, service) → индекс, по индексу — номер файла, первая/последняя строка и отступ
+        self._location_index: Dict[Tuple[str, str], int] = {}
+        self._location_file = array('I')
+        self._location_start = array('I')
+        self._location_end = array('I')
+        self._location_indent = array('H')
+        self._files: List[Path] = []
+        self._file_index: Dict[Path, int] = {}
+        
+    @cached_property
+    def services_by_prod(self) -> Dict[str, Set[str]]:  # {service: {prods}}
+        """Обратный индекс сервис → проды, строится по требованию из prods_by_service."""
+        services_by_prod = defaultdict(set)
+        for prod, services in self.prods_by_service.items():
+            for service in services:
+                services_by_prod[service].add(prod)
+        return services_by_prod
+    
+    def matched_services_by_prod(self) -> Dict[str, Set[str]]:
+        """
+        Проды для сервисов, подходящих под фильтр: {service: {prods}}.
         
+        Строится одним проходом по prods_by_service, без полного обратного индекса.
+        """
+        matched = defaultdict(set)
+        for prod, services in self.prods_by_service.items():
+            for service in services:
+                if self.matches_service_filter(service):
+                    matched[service].add(prod)
+        return matched
+    
+    def service_prod_counts(self) -> Counter:
+        """Количество продов для каждого сервиса: {service: count}."""
+        return self._service_prod_count
+    
     def is_yml_file(self, filename: str) -> bool:
         """Проверяет, является ли файл yml/yaml файлом."""
-        pattern = r'^.+\.(yml|yaml)$'
-        return bool(re.match(pattern, filename, re.IGNORECASE))
+        name = filename.lower()
+        return name.endswith(YML_EXTENSIONS) and name not in YML_EXTENSIONS
     
     def extract_file_name(self, filename: str) -> str:
         """Извлекает имя файла без расширения (имя прода)."""
-        name_without_ext = re.sub(r'\.(yml|yaml)$', '', filename, flags=re.IGNORECASE)
+        name_without_ext = YML_EXT_PATTERN.sub('', filename)
         return name_without_ext if name_without_ext else "unknown"
     
     def matches_service_filter(self, service_name: str) -> bool:
         """Проверяет, соответствует ли сервис фильтру."""
-        if not self.service_filter:
+        if self._filter_folded is None:
             return True
-        return self.service_filter.lower() in service_name.lower()
+        # Дешёвая проверка без поиска приведённого имени; при промахе — полное сравнение
+        if self._filter_ascii_lower and self.service_filter in service_name:
+            return True
+        folded = self._services_folded.get(service_name)
+        if folded is None:
+            folded = service_name.casefold()
+        return self._filter_folded in folded
     
-    def extract_services(self, file_path: Path, prod_name: str) -> None:
-        """Извлекает список сервисов из файла."""
-        in_services_block = False
-        services_indent = -1
-        current_service_indent = -1
-        current_service_name = None
-        current_service_start = -1
+    def add_services(self, file_path: Path, prod_name: str, entries: List[Tuple[str, int, int, int]]) -> None:
+        """Добавляет сервисы, найденные parse_services, в индексы."""
+        if not entries:
+            return
         
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-                for line_num, line in enumerate(lines):
-                    # Пропускаем пустые строки и комментарии
-                    if not line.strip() or line.strip().startswith('#'):
-                        continue
-                    
-                    # Определяем уровень отступа
-                    line_indent = len(line) - len(line.lstrip())
-                    
-                    # Ищем блок services:
-                    if re.match(r'^services:\s*$', line.strip()):
-                        in_services_block = True
-                        services_indent = line_indent
-                        continue
-                    
-                    # Если мы в блоке services
-                    if in_services_block:
-                        # Проверяем, не вышли ли мы из блока services
-                        if line_indent <= services_indent and line.strip().endswith(':'):
-                            if not line.strip().startswith('-'):
-                                # Сохраняем предыдущий сервис
-                                if current_service_name:
-                                    self.service_locations[(prod_name, current_service_name)] = {
-                                        'file_path': file_path,
-                                        'line_start': current_service_start,
-                                        'line_end': line_num - 1,
-                                        'indent': current_service_indent
-                                    }
-                                in_services_block = False
-                                continue
-                        
-                        # Ищем определение сервиса
-                        service_match = re.match(r'^(\s*)(-\s*)?([a-zA-Z0-9_-]+):\s*$', line)
-                        if service_match:
-                            indent = len(service_match.group(1))
-                            service_name = service_match.group(3)
-                            
-                            # Проверяем, что это сервис (на один уровень глубже services)
-                            if indent > services_indent:
-                                if current_service_indent == -1 or indent <= current_service_indent:
-                                    # Сохраняем предыдущий сервис
-                                    if current_service_name:
-                                        self.service_locations[(prod_name, current_service_name)] = {
-                                            'file_path': file_path,
-                                            'line_start': current_service_start,
-                                            'line_end': line_num - 1,
-                                            'indent': current_service_indent
-                                        }
-                                    
-                                    current_service_indent = indent
-                                    current_service_name = service_name
-                                    current_service_start = line_num
-                                    
-                                    # Добавляем связи
-                                    self.services_by_prod[service_name].add(prod_name)
-                                    self.prods_by_service[prod_name].add(service_name)
-                
-                # Сохраняем последний сервис
-                if current_service_name:
-                    self.service_locations[(prod_name, current_service_name)] = {
-                        'file_path': file_path,
-                        'line_start': current_service_start,
-                        'line_end': len(lines) - 1,
-                        'indent': current_service_indent
-                    }
-                            
-        except Exception as e:
-            print(f"⚠️  Ошибка при чтении {file_path}: {e}", file=sys.stderr)
+        file_idx = self._file_index.get(file_path)
+        if file_idx is None:
+            file_idx = self._file_index[file_path] = len(self._files)
+            self._files.append(file_path)
+        
+        # Одни и те же имена встречаются на десятках продов: интернируем их, чтобы
+        # не держать копии и сравнивать ключи словарей по идентичности. Делаем это
+        # здесь, а не в parse_services: строки из пула процессов и кэша приходят
+        # распакованными из pickle, то есть новыми объектами
+        prod_name = sys.intern(prod_name)
+        services = self.prods_by_service[prod_name]
+        for service_name, line_start, line_end, indent in entries:
+            service_name = sys.intern(service_name)
+            if service_name not in self._services_folded:
+                self._services_folded[service_name] = service_name.casefold()
+            if service_name not in services:
+                services.add(service_name)
+                self._service_prod_count[service_name] += 1
+            key = (prod_name, service_name)
+            idx = self._location_index.get(key)
+            if idx is None:
+                self._location_index[key] = len(self._location_file)
+                self._location_file.append(file_idx)
+                self._location_start.append(line_start)
+                self._location_end.append(line_end)
+                self._location_indent.append(indent)
+            else:
+                self._location_file[idx] = file_idx
+                self._location_start[idx] = line_start
+                self._location_end[idx] = line_end
+                self._location_indent[idx] = indent
     
-    def scan_directory(self) -> None:
-        """Сканирует директорию с yml файлами."""
+    def get_service_location(self, prod_name: str, service_name: str) -> Optional[Tuple[Path, int, int, int]]:
+        """Возвращает (file_path, line_start, line_end, indent) сервиса на проде или None."""
+        idx = self._location_index.get((prod_name, service_name))
+        if idx is None:
+            return None
+        return (self._files[self._location_file[idx]], self._location_start[idx],
+                self._location_end[idx], self._location_indent[idx])
+    
+    def scan_directory(self, only_matching: bool = False) -> None:
+        """
+        Сканирует директорию с yml файлами.
+        
+        only_matching=True можно передавать, когда дальше нужны только сервисы,
+        подходящие под фильтр: файлы, в которых фильтр не встречается
+        (без учёта регистра), тогда не разбираются.
+        """
         if not self.search_path.exists():
             print(f"❌ Путь {self.search_path} не существует")
             sys.exit(1)
@@ -126,9 +417,14 @@ class ServiceFinder:
             print(f"❌ {self.search_path} не является директорией")
             sys.exit(1)
         
-        # Собираем все yml файлы
-        yml_files = [f for f in self.search_path.iterdir() 
-                     if f.is_file() and self.is_yml_file(f.name)]
+        # Собираем все yml файлы: DirEntry.is_file() берёт тип из результата
+        # readdir и не делает отдельный stat на каждый файл
+        with os.scandir(self.search_path) as dir_entries:
+            yml_entries = [entry for entry in dir_entries
+                           if self.is_yml_file(entry.name) and entry.is_file()]
+        yml_files = [Path(entry.path) for entry in yml_entries]
+        # Кэш ключуется по entry.path: для пути '.' это './b.yml', а str(Path) даёт 'b.yml'
+        cache_keys = {yml_file: entry.path for yml_file, entry in zip(yml_files, yml_entries)}
         
         if not yml_files:
             print("⚠️  Не найдено yml/yaml файлов")
@@ -136,10 +432,63 @@ class ServiceFinder:
         
         self.total_files_scanned = len(yml_files)
         
-        # Сканируем каждый файл
+        required = None
+        if only_matching and self._filter_folded:
+            required = re.compile(re.escape(self._filter_folded.encode('utf-8')), re.IGNORECASE)
+        parse = partial(parse_services, required=required)
+        
+        # Файлы, не изменившиеся с прошлого запуска (те же mtime и размер),
+        # берём из кэша и заново не разбираем
+        cache_path = get_cache_path(self.search_path) if self.use_cache else None
+        cache = load_scan_cache(cache_path) if cache_path else {}
+        new_cache = {}
+        parsed = {}
+        files_to_parse = []
+        for yml_file, entry in zip(yml_files, yml_entries):
+            try:
+                stat = entry.stat()
+            except OSError:
+                files_to_parse.append(yml_file)
+                continue
+            
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cached = cache.get(entry.path)
+            if cached is not None and cached[0] == signature:
+                parsed[yml_file] = cached[1]
+                new_cache[entry.path] = cached
+            else:
+                files_to_parse.append(yml_file)
+                if required is None:
+                    new_cache[entry.path] = (signature, None)
+        
+        # Файлы независимы друг от друга: при большом их количестве разбираем
+        # их параллельно в пуле процессов, а индексы собираем в основном процессе
+        if len(files_to_parse) >= PARALLEL_SCAN_MIN_FILES:
+            prefetch_files(files_to_parse)
+            with ProcessPoolExecutor() as executor:
+                parsed.update(zip(files_to_parse, executor.map(parse, files_to_parse, chunksize=8)))
+        else:
+            parsed.update((yml_file, parse(yml_file)) for yml_file in files_to_parse)
+        
+        # Ошибки чтения выводим одним блоком после разбора, а не вперемешку из процессов
+        for yml_file in files_to_parse:
+            entries, error = parsed[yml_file]
+            if error:
+                print(f"⚠️  Ошибка при чтении {yml_file}: {error}", file=sys.stderr)
+                new_cache.pop(cache_keys[yml_file], None)
+            parsed[yml_file] = entries
+        
+        # В кэш попадают только полные результаты разбора (без фильтра required и без ошибок)
+        if cache_path and (files_to_parse or len(new_cache) != len(cache)):
+            for yml_file, cache_key in cache_keys.items():
+                cached = new_cache.get(cache_key)
+                if cached is not None and cached[1] is None:
+                    new_cache[cache_key] = (cached[0], parsed[yml_file])
+            save_scan_cache(cache_path, new_cache)
+        
         for yml_file in yml_files:
             prod_name = self.extract_file_name(yml_file.name)
-            self.extract_services(yml_file, prod_name)
+            self.add_services(yml_file, prod_name, parsed[yml_file])
     
     def add_active_profile(self, profile_name: str, dry_run: bool = False) -> None:
         """Добавляет активный профиль к сервисам на продах."""
@@ -147,8 +496,7 @@ class ServiceFinder:
             print("⚠️  Укажите название сервиса с помощью -s")
             return
         
-        matched_services = {s: prods for s, prods in self.services_by_prod.items() 
-                          if self.matches_service_filter(s)}
+        matched_services = self.matched_services_by_prod()
         
         if not matched_services:
             print(f"❌ Сервисы, соответствующие '{self.service_filter}', не найдены")
@@ -156,27 +504,32 @@ class ServiceFinder:
         
         modifications = []
         
+        # Каждый файл читается один раз, даже если в нём несколько подходящих сервисов;
+        # эти же байты потом используются при записи изменений
+        file_contents: Dict[Path, Tuple[bytes, List[str]]] = {}
+        
         for service_name, prods in matched_services.items():
             for prod_name in prods:
-                key = (prod_name, service_name)
-                if key not in self.service_locations:
+                location = self.get_service_location(prod_name, service_name)
+                if location is None:
                     print(f"⚠️  Не найдена информация о расположении сервиса {service_name} на {prod_name}")
                     continue
                 
-                location = self.service_locations[key]
-                file_path = location['file_path']
-                line_start = location['line_start']
-                line_end = location['line_end']
-                indent = location['indent']
+                file_path, line_start, line_end, indent = location
                 
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                    
                     # Ищем строку active_profiles в блоке сервиса
                     active_profiles_line = None
                     active_profiles_indent = indent + 2  # Обычно на 2 пробела глубже
                     
+                    contents = file_contents.get(file_path)
+                    if contents is None:
+                        data = file_path.read_bytes()
+                        # Те же строки, что дал бы open() в текстовом режиме (универсальные переводы строк)
+                        lines = io.StringIO(data.decode('utf-8'), newline=None).readlines()
+                        contents = file_contents[file_path] = (data, lines)
+                    lines = contents[1]
+                    
                     for i in range(line_start + 1, min(line_end + 1, len(lines))):
                         line = lines[i]
                         current_indent = len(line) - len(line.lstrip())
@@ -186,14 +539,13 @@ class ServiceFinder:
                             break
                         
                         # Ищем active_profiles
-                        if re.match(r'^\s*active_profiles:\s*(.*)$', line):
+                        match = ACTIVE_PROFILES_PATTERN.match(line)
+                        if match:
                             active_profiles_line = i
                             break
                     
                     if active_profiles_line is not None:
                         # active_profiles уже существует, добавляем к списку
-                        line = lines[active_profiles_line]
-                        match = re.match(r'^(\s*active_profiles:\s*)(.*)$', line)
                         if match:
                             prefix = match.group(1)
                             existing_profiles = match.group(2).strip()
@@ -247,28 +599,34 @@ class ServiceFinder:
             print("ℹ️  Нет изменений для применения")
             return
         
-        # Выводим предварительный просмотр
-        print("=" * 80)
-        print(f"📝 Планируемые изменения {'(DRY RUN)' if dry_run else ''}")
-        print("=" * 80)
-        print()
+        # Выводим предварительный просмотр: собираем весь текст и выводим одной записью,
+        # а не сотнями вызовов print()
+        separator = "=" * 80 + "\n"
+        parts = [
+            separator,
+            f"📝 Планируемые изменения {'(DRY RUN)' if dry_run else ''}\n",
+            separator,
+            "\n",
+        ]
+        append = parts.append
         
         for mod in modifications:
-            print(f"📄 Файл: {mod['file_path'].name}")
-            print(f"   Прод: {mod['prod']}")
-            print(f"   Сервис: {mod['service']}")
-            print(f"   Действие: {'Обновление' if mod['action'] == 'update' else 'Добавление'} active_profiles")
+            append(f"📄 Файл: {mod['file_path'].name}\n")
+            append(f"   Прод: {mod['prod']}\n")
+            append(f"   Сервис: {mod['service']}\n")
+            append(f"   Действие: {'Обновление' if mod['action'] == 'update' else 'Добавление'} active_profiles\n")
             
             if mod['action'] == 'update':
-                print(f"   Было:  {mod['old_line'].rstrip()}")
-                print(f"   Стало: {mod['new_line'].rstrip()}")
+                append(f"   Было:  {mod['old_line'].rstrip()}\n")
+                append(f"   Стало: {mod['new_line'].rstrip()}\n")
             else:
-                print(f"   Добавлено: {mod['new_line'].rstrip()}")
-            print()
+                append(f"   Добавлено: {mod['new_line'].rstrip()}\n")
+            append("\n")
         
-        print("=" * 80)
-        print(f"Всего изменений: {len(modifications)}")
-        print("=" * 80)
+        append(separator)
+        append(f"Всего изменений: {len(modifications)}\n")
+        append(separator)
+        sys.stdout.write("".join(parts))
         
         if dry_run:
             print("\n✅ Режим dry-run: изменения не применены")
@@ -283,22 +641,11 @@ class ServiceFinder:
         modified_count = 0
         for file_path, file_mods in files_to_modify.items():
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
+                data = apply_line_modifications(file_contents[file_path][0], file_mods)
                 
-                # Сортируем модификации по номеру строки в обратном порядке
-                # чтобы вставки не сдвигали номера строк
-                file_mods.sort(key=lambda x: x['line_num'], reverse=True)
-                
-                for mod in file_mods:
-                    if mod['action'] == 'update':
-                        lines[mod['line_num']] = mod['new_line']
-                    else:  # insert
-                        lines.insert(mod['line_num'], mod['new_line'])
-                
-                # Записываем обратно
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.writelines(lines)
+                # Записываем обратно одним вызовом
+                with open(file_path, 'wb') as f:
+                    f.write(data)
                 
                 modified_count += 1
                 print(f"✅ Обновлен: {file_path}")
@@ -315,8 +662,7 @@ class ServiceFinder:
             print("⚠️  Укажите название сервиса с помощью -s")
             return
         
-        matched_services = {s: prods for s, prods in self.services_by_prod.items() 
-                          if self.matches_service_filter(s)}
+        matched_services = self.matched_services_by_prod()
         
         if not matched_services:
             print(f"❌ Сервисы, соответствующие '{self.service_filter}', не найдены")
@@ -367,9 +713,10 @@ class ServiceFinder:
         print(f"Всего сервисов: {len(services)}")
         print("=" * 80)
     
-    def print_services_summary(self) -> None:
-        """Выводит сводку по всем сервисам."""
-        if not self.services_by_prod:
+    def print_services_summary(self, top: Optional[int] = None) -> None:
+        """Выводит сводку по всем сервисам (или только top сервисов с наибольшим числом продов)."""
+        prod_counts = self.service_prod_counts()
+        if not prod_counts:
             print("❌ Сервисы не найдены")
             return
         
@@ -379,25 +726,22 @@ class ServiceFinder:
         print()
         
         # Сортируем по количеству продов (по убыванию)
-        sorted_services = sorted(self.services_by_prod.items(), 
-                                key=lambda x: (len(x[1]), x[0]), 
-                                reverse=True)
+        sorted_services = top_items(prod_counts.items(), key=lambda x: (x[1], x[0]), top=top)
         
         print(f"{'Сервис':<40} {'Кол-во продов':>15}")
         print("-" * 80)
         
-        for service, prods in sorted_services:
-            prod_count = len(prods)
+        for service, prod_count in sorted_services:
             print(f"{service:<40} {prod_count:>15}")
         
         print()
         print("=" * 80)
-        print(f"Всего уникальных сервисов: {len(self.services_by_prod)}")
+        print(f"Всего уникальных сервисов: {len(prod_counts)}")
         print(f"Всего продов: {len(self.prods_by_service)}")
         print("=" * 80)
     
-    def print_prods_summary(self) -> None:
-        """Выводит сводку по всем продам."""
+    def print_prods_summary(self, top: Optional[int] = None) -> None:
+        """Выводит сводку по всем продам (или только top продов с наибольшим числом сервисов)."""
         if not self.prods_by_service:
             print("❌ Проды не найдены")
             return
@@ -408,9 +752,7 @@ class ServiceFinder:
         print()
         
         # Сортируем по количеству сервисов (по убыванию)
-        sorted_prods = sorted(self.prods_by_service.items(), 
-                             key=lambda x: (len(x[1]), x[0]), 
-                             reverse=True)
+        sorted_prods = top_items(self.prods_by_service.items(), key=lambda x: (len(x[1]), x[0]), top=top)
         
         print(f"{'Прод':<40} {'Кол-во сервисов':>15}")
         print("-" * 80)
@@ -422,41 +764,57 @@ class ServiceFinder:
         print()
         print("=" * 80)
         print(f"Всего продов: {len(self.prods_by_service)}")
-        print(f"Всего уникальных сервисов: {len(self.services_by_prod)}")
+        print(f"Всего уникальных сервисов: {len(set().union(*self.prods_by_service.values()))}")
         print("=" * 80)
     
     def export_to_csv(self, output_file: str, mode: str = 'services') -> None:
         """Экспортирует данные в CSV."""
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                if mode == 'services':
-                    # Формат: service,prod
-                    f.write("service,prod\n")
-                    for service, prods in sorted(self.services_by_prod.items()):
-                        for prod in sorted(prods):
-                            f.write(f"{service},{prod}\n")
-                
-                elif mode == 'prods':
-                    # Формат: prod,service
-                    f.write("prod,service\n")
-                    for prod, services in sorted(self.prods_by_service.items()):
-                        for service in sorted(services):
-                            f.write(f"{prod},{service}\n")
-                
-                elif mode == 'summary':
-                    # Формат: service,prod_count
-                    f.write("service,prod_count\n")
-                    sorted_services = sorted(self.services_by_prod.items(), 
-                                           key=lambda x: len(x[1]), 
-                                           reverse=True)
-                    for service, prods in sorted_services:
-                        f.write(f"{service},{len(prods)}\n")
+            # Собираем CSV в памяти через C-реализацию csv.writer и пишем файл одним вызовом
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator='\n')
+            
+            if mode == 'services':
+                # Формат: service,prod
+                writer.writerow(('service', 'prod'))
+                writer.writerows((service, prod)
+                                 for service, prods in sorted(self.services_by_prod.items())
+                                 for prod in sorted(prods))
+            
+            elif mode == 'prods':
+                # Формат: prod,service
+                writer.writerow(('prod', 'service'))
+                writer.writerows((prod, service)
+                                 for prod, services in sorted(self.prods_by_service.items())
+                                 for service in sorted(services))
+            
+            elif mode == 'summary':
+                # Формат: service,prod_count
+                writer.writerow(('service', 'prod_count'))
+                sorted_services = sorted(self.service_prod_counts().items(), 
+                                       key=lambda x: x[1], 
+                                       reverse=True)
+                writer.writerows(sorted_services)
+            
+            with open(output_file, 'w', encoding='utf-8', newline='') as f:
+                f.write(buffer.getvalue())
             
             print(f"\n✅ Данные сохранены: {output_file}")
         except Exception as e:
             print(f"❌ Ошибка сохранения: {e}", file=sys.stderr)
 
 
+def positive_int(value: str) -> int:
+    """Тип аргумента argparse: целое число больше нуля."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается целое число, получено '{value}'")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"ожидается число больше 0, получено {number}")
+    return number
+
+
 def parse_arguments():
     """Парсинг аргументов."""
     parser = argparse.ArgumentParser(
@@ -479,6 +837,9 @@ def parse_arguments():
   # Показать сводку по всем продам
   %(prog)s /path/to/configs --prods-summary
   
+  # Показать 10 сервисов, развёрнутых на наибольшем числе продов
+  %(prog)s /path/to/configs --services-summary --top 10
+  
   # Экспортировать в CSV
   %(prog)s /path/to/configs -s operator_api -o report.csv
   %(prog)s /path/to/configs --services-summary -o summary.csv --csv-mode summary
@@ -499,6 +860,8 @@ def parse_arguments():
                        help='Показать сводку по всем сервисам')
     parser.add_argument('--prods-summary', action='store_true',
                        help='Показать сводку по всем продам')
+    parser.add_argument('--top', type=positive_int, metavar='N',
+                       help='Показать в сводке только N первых строк (для --services-summary/--prods-summary)')
     parser.add_argument('-o', '--output', help='Сохранить результат в CSV файл')
     parser.add_argument('--csv-mode', choices=['services', 'prods', 'summary'],
                        default='services',
@@ -507,6 +870,8 @@ def parse_arguments():
                        help='Добавить активный профиль к найденным сервисам')
     parser.add_argument('--dry-run', action='store_true',
                        help='Показать изменения без их применения (для --add-active-profile)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Не использовать кэш разбора файлов (~/.cache/find_service_on_prods)')
     
     return parser.parse_args()
 
@@ -514,8 +879,12 @@ def parse_arguments():
 def main():
     args = parse_arguments()
     
-    finder = ServiceFinder(args.path, args.service_filter)
-    finder.scan_directory()
+    finder = ServiceFinder(args.path, args.service_filter, use_cache=not args.no_cache)
+    
+    # Полный индекс нужен только режимам, которые показывают все сервисы
+    # (--prod, сводки, CSV-экспорт); остальным достаточно подходящих под -s
+    needs_all_services = args.prod or args.services_summary or args.prods_summary or args.output
+    finder.scan_directory(only_matching=bool(args.add_active_profile or not needs_all_services))
     
     # Определяем, что показывать
     if args.add_active_profile:
@@ -526,11 +895,11 @@ def main():
     elif args.prod:
         finder.print_services_on_prod(args.prod)
     elif args.services_summary:
-        finder.print_services_summary()
+        finder.print_services_summary(args.top)
         if args.output:
             finder.export_to_csv(args.output, 'summary')
     elif args.prods_summary:
-        finder.print_prods_summary()
+        finder.print_prods_summary(args.top)
     elif args.service_filter:
         finder.print_prods_with_service()
         if args.output:
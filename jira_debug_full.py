@@ -6,10 +6,17 @@ Finds projects, versions, and issues using multiple methods
 
 import os
 import sys
-import requests
+import heapq
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from requests.auth import HTTPBasicAuth
 import json
 
+from jira_http import create_session, parse_json
+
+
+SESSION = create_session()
+
 
 def get_jira_credentials():
     """Get Jira credentials from environment variables"""
@@ -28,41 +35,39 @@ def get_jira_credentials():
 def test_connection(jira_url: str, auth: HTTPBasicAuth):
     """Test Jira connection"""
     url = f"{jira_url}/rest/api/3/myself"
-    headers = {"Accept": "application/json"}
     
-    response = requests.get(url, headers=headers, auth=auth)
+    response = SESSION.get(url, auth=auth)
     response.raise_for_status()
     
-    return response.json()
+    return parse_json(response)
 
 
-def list_all_projects(jira_url: str, auth: HTTPBasicAuth):
-    """List all available projects"""
-    url = f"{jira_url}/rest/api/3/project"
-    headers = {"Accept": "application/json"}
+def list_all_projects(jira_url: str, auth: HTTPBasicAuth, max_results: int = 30):
+    """List the first projects sorted by key (one page of /project/search with its total)"""
+    url = f"{jira_url}/rest/api/3/project/search"
+    
+    params = {
+        "maxResults": max_results,
+        "orderBy": "key"
+    }
     
-    response = requests.get(url, headers=headers, auth=auth)
+    response = SESSION.get(url, auth=auth, params=params)
     response.raise_for_status()
     
-    return response.json()
+    return parse_json(response)
 
 
 def search_issues_raw(jira_url: str, auth: HTTPBasicAuth, jql: str, max_results: int = 100):
     """Raw JQL search"""
     url = f"{jira_url}/rest/api/3/search"
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
     
     params = {
         "jql": jql,
         "maxResults": max_results,
-        "fields": "key,summary,project,fixVersions"
+        "fields": "summary,project"
     }
     
-    print(f"  Trying GET method with /rest/api/3/search")
-    response = requests.get(url, headers=headers, auth=auth, params=params)
+    response = SESSION.get(url, auth=auth, params=params)
     
     return response
 
@@ -70,19 +75,14 @@ def search_issues_raw(jira_url: str, auth: HTTPBasicAuth, jql: str, max_results:
 def search_issues_jql(jira_url: str, auth: HTTPBasicAuth, jql: str, max_results: int = 100):
     """JQL search using POST"""
     url = f"{jira_url}/rest/api/3/search/jql"
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
     
     payload = {
         "jql": jql,
         "maxResults": max_results,
-        "fields": ["key", "summary", "project", "fixVersions"]
+        "fields": ["summary", "project"]
     }
     
-    print(f"  Trying POST method with /rest/api/3/search/jql")
-    response = requests.post(url, headers=headers, auth=auth, json=payload)
+    response = SESSION.post(url, auth=auth, json=payload)
     
     return response
 
@@ -90,9 +90,8 @@ def search_issues_jql(jira_url: str, auth: HTTPBasicAuth, jql: str, max_results:
 def get_project_versions(jira_url: str, auth: HTTPBasicAuth, project_key: str):
     """Get all versions for a project"""
     url = f"{jira_url}/rest/api/3/project/{project_key}/versions"
-    headers = {"Accept": "application/json"}
 
-    response = requests.get(url, headers=headers, auth=auth)
+    response = SESSION.get(url, auth=auth)
 
     return response
 
@@ -100,42 +99,63 @@ def get_project_versions(jira_url: str, auth: HTTPBasicAuth, project_key: str):
 def get_all_fields(jira_url: str, auth: HTTPBasicAuth):
     """Get all available fields in Jira"""
     url = f"{jira_url}/rest/api/3/field"
-    headers = {"Accept": "application/json"}
 
-    response = requests.get(url, headers=headers, auth=auth)
+    response = SESSION.get(url, auth=auth)
     response.raise_for_status()
 
-    return response.json()
+    return parse_json(response)
 
 
 def get_project_fields(jira_url: str, auth: HTTPBasicAuth, project_key: str):
     """Get fields available for a specific project"""
     url = f"{jira_url}/rest/api/3/project/{project_key}"
-    headers = {"Accept": "application/json"}
 
-    response = requests.get(url, headers=headers, auth=auth)
+    response = SESSION.get(url, auth=auth)
     response.raise_for_status()
 
-    return response.json()
+    return parse_json(response)
 
 
 def get_create_meta_fields(jira_url: str, auth: HTTPBasicAuth, project_key: str):
     """Get fields from create metadata for a project"""
     url = f"{jira_url}/rest/api/3/issue/createmeta"
-    headers = {"Accept": "application/json"}
 
     params = {
         "projectKeys": project_key,
         "expand": "projects.issuetypes.fields"
     }
 
-    response = requests.get(url, headers=headers, auth=auth, params=params)
+    response = SESSION.get(url, auth=auth, params=params)
     response.raise_for_status()
 
-    return response.json()
+    return parse_json(response)
+
+
+def run_probes(jira_url: str, auth: HTTPBasicAuth, jqls: list, probes: list) -> dict:
+    """Run every (jql, (method, description, search function)) probe concurrently; returns {(jql, method): response or exception}"""
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=len(jqls) * len(probes)) as executor:
+        futures = {
+            executor.submit(search_func, jira_url, auth, jql, 100): (jql, method)
+            for jql in jqls
+            for method, _, search_func in probes
+        }
+        
+        for future in as_completed(futures):
+            try:
+                outcomes[futures[future]] = future.result()
+            except Exception as e:
+                outcomes[futures[future]] = e
+    
+    return outcomes
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Find Jira projects, versions and issues using multiple search methods')
+    parser.add_argument('--all', action='store_true',
+                        help='Try every JQL variant even after one has found issues')
+    args = parser.parse_args()
+    
     print("="*80)
     print("🔍 COMPREHENSIVE JIRA DEBUG TOOL")
     print("="*80)
@@ -153,11 +173,19 @@ def main():
         print(f"   ❌ Connection failed: {e}")
         sys.exit(1)
     
+    # Projects and fields don't depend on each other, so request both at once
+    prefetch = ThreadPoolExecutor(max_workers=2)
+    projects_future = prefetch.submit(list_all_projects, jira_url, auth)
+    fields_future = prefetch.submit(get_all_fields, jira_url, auth)
+    prefetch.shutdown(wait=False)
+    
     # Step 2: List all projects
     print("\n2️⃣ Fetching all accessible projects...")
     try:
-        projects = list_all_projects(jira_url, auth)
-        print(f"   ✅ Found {len(projects)} projects\n")
+        projects_page = projects_future.result()
+        projects = projects_page.get('values', [])
+        total_projects = projects_page.get('total', len(projects))
+        print(f"   ✅ Found {total_projects} projects\n")
         
         if not projects:
             print("   ❌ No projects found. Check your permissions.")
@@ -166,7 +194,8 @@ def main():
         print(f"   {'KEY':<20} {'NAME':<50}")
         print(f"   {'-'*20} {'-'*50}")
         
-        for project in sorted(projects, key=lambda x: x['key'])[:30]:
+        # Already sorted by key and capped by the server
+        for project in projects:
             key = project.get('key', 'N/A')
             name = project.get('name', 'N/A')
             
@@ -175,8 +204,8 @@ def main():
             
             print(f"   {key:<20} {name:<50}")
         
-        if len(projects) > 30:
-            print(f"   ... and {len(projects) - 30} more projects")
+        if total_projects > len(projects):
+            print(f"   ... and {total_projects - len(projects)} more projects")
         
     except Exception as e:
         print(f"   ❌ Error: {e}")
@@ -185,7 +214,7 @@ def main():
     # Step 2.5: List all fields
     print("\n2.5️⃣ Fetching all available fields...")
     try:
-        fields = get_all_fields(jira_url, auth)
+        fields = fields_future.result()
         print(f"   ✅ Found {len(fields)} fields\n")
 
         # Categorize fields
@@ -375,54 +404,60 @@ def main():
     
     results = {}
     
-    for i, jql in enumerate(search_methods, 1):
-        print(f"\n🧪 Method {i}: {jql}")
+    # (method, description, search function); the description is printed with the results,
+    # since the probes themselves run in worker threads
+    probes = [
+        ('GET /search', 'GET method with /rest/api/3/search', search_issues_raw),
+        ('POST /search/jql', 'POST method with /rest/api/3/search/jql', search_issues_jql),
+    ]
+    
+    # By default stop at the first JQL variant that finds issues; with --all every
+    # variant is probed, and since probes are independent they are all sent at once
+    waves = [search_methods] if args.all else [[jql] for jql in search_methods]
+    method_numbers = {jql: i for i, jql in enumerate(search_methods, 1)}
+    probed_count = 0
+    
+    for wave in waves:
+        outcomes = run_probes(jira_url, auth, wave, probes)
         
-        # Try GET method
-        try:
-            response = search_issues_raw(jira_url, auth, jql, 100)
+        for jql in wave:
+            probed_count += 1
+            print(f"\n🧪 Method {method_numbers[jql]}: {jql}")
             
-            if response.status_code == 200:
-                data = response.json()
-                total = data.get('total', 0)
-                issues = data.get('issues', [])
+            for method, description, _ in probes:
+                print(f"  Trying {description}")
+                response = outcomes[(jql, method)]
                 
-                print(f"  ✅ GET /search - Found {total} issues")
+                if isinstance(response, Exception):
+                    print(f"  ❌ {method} - Error: {response}")
+                    continue
                 
-                if total > 0:
-                    results[jql] = {
-                        'method': 'GET /search',
-                        'total': total,
-                        'issues': issues
-                    }
-            else:
-                print(f"  ❌ GET /search - Status {response.status_code}")
-                print(f"     {response.text[:200]}")
-        except Exception as e:
-            print(f"  ❌ GET /search - Error: {e}")
+                try:
+                    if response.status_code == 200:
+                        data = parse_json(response)
+                        issues = data.get('issues', [])
+                        # /search/jql does not report a total, count the returned page instead
+                        total = data.get('total', len(issues))
+                        
+                        print(f"  ✅ {method} - Found {total} issues")
+                        
+                        if total > 0 and jql not in results:
+                            results[jql] = {
+                                'method': method,
+                                'total': total,
+                                'issues': issues
+                            }
+                    else:
+                        print(f"  ❌ {method} - Status {response.status_code}")
+                        print(f"     {response.text[:200]}")
+                except Exception as e:
+                    print(f"  ❌ {method} - Error: {e}")
         
-        # Try POST method
-        try:
-            response = search_issues_jql(jira_url, auth, jql, 100)
-            
-            if response.status_code == 200:
-                data = response.json()
-                total = data.get('total', 0)
-                issues = data.get('issues', [])
-                
-                print(f"  ✅ POST /search/jql - Found {total} issues")
-                
-                if total > 0 and jql not in results:
-                    results[jql] = {
-                        'method': 'POST /search/jql',
-                        'total': total,
-                        'issues': issues
-                    }
-            else:
-                print(f"  ❌ POST /search/jql - Status {response.status_code}")
-                print(f"     {response.text[:200]}")
-        except Exception as e:
-            print(f"  ❌ POST /search/jql - Error: {e}")
+        if results and not args.all:
+            break
+    
+    if probed_count < len(search_methods):
+        print(f"\n   ⏭️  Skipped {len(search_methods) - probed_count} remaining method(s), use --all to try every one")
     
     # Step 5: Check versions in project
     if project_key:
@@ -434,11 +469,12 @@ def main():
             response = get_project_versions(jira_url, auth, project_key)
             
             if response.status_code == 200:
-                versions = response.json()
+                versions = parse_json(response)
                 print(f"\n✅ Found {len(versions)} versions in project {project_key}")
                 
                 # Look for similar versions
-                matching = [v for v in versions if version_name.lower() in v['name'].lower()]
+                needle = version_name.casefold()
+                matching = [v for v in versions if needle in v['name'].casefold()]
                 
                 if matching:
                     print(f"\n📋 Versions containing '{version_name}':")
@@ -450,7 +486,7 @@ def main():
                 else:
                     print(f"\n⚠️  No versions found containing '{version_name}'")
                     print(f"\n📋 All versions in {project_key} (showing first 20):")
-                    for v in sorted(versions, key=lambda x: x['name'], reverse=True)[:20]:
+                    for v in heapq.nlargest(20, versions, key=lambda x: x['name']):
                         name = v.get('name', 'N/A')
                         print(f"   - {name}")
             else:
@@ -8,10 +8,45 @@ Uses the correct /rest/api/3/search/jql endpoint
 import os
 import json
 import sys
+import hashlib
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, Any
 import requests
 from requests.auth import HTTPBasicAuth
 
+from jira_http import create_session, orjson, parse_json
+
+
+def get_async_workers(default: int = 8) -> int:
+    """Number of parallel Jira requests, from JIRA_ASYNC_WORKERS (default: 8)"""
+    try:
+        return max(1, int(os.getenv('JIRA_ASYNC_WORKERS', default)))
+    except ValueError:
+        return default
+
+
+# The pool must hold a connection per worker, otherwise extra connections are discarded
+SESSION = create_session(pool_maxsize=max(16, get_async_workers()))
+
+# Fields fetched for the export, including Release announce type (customfield_11823)
+# and Short description (customfield_14958); the issue key is always returned, it is not a field
+EXPORT_FIELDS = ("summary", "components", "customfield_11823", "customfield_14958")
+
+# "KEY - text" line of an exported issue or short description
+ISSUE_LINE_FORMAT = "%s - %s"
+
+# Service group by component name prefix ("jackpot-api" -> "jackpot"); everything else is GP
+SERVICE_GROUP_BY_PREFIX = {
+    'jackpot': 'Jackpot system',
+    'spe': 'SPE system',
+    'replay': 'Replay system'
+}
+
+# Single-page search results are revalidated with If-None-Match against ~/.cache/jira_export (--no-cache disables it)
+RESPONSE_CACHE_ENABLED = True
+
 
 def get_jira_credentials():
     """Get Jira credentials from environment variables"""
@@ -27,7 +62,8 @@ def get_jira_credentials():
     return jira_url, jira_username, jira_token
 
 
-def search_issues(jira_url: str, auth: HTTPBasicAuth, jql: str, fields: list, max_results: int = 1000) -> Dict[str, Any]:
+def search_issues(jira_url: str, auth: HTTPBasicAuth, jql: str, fields: list, max_results: int = 1000,
+                  next_page_token: str = None) -> Dict[str, Any]:
     """
     Search Jira issues using API v3 with the correct /rest/api/3/search/jql endpoint
     
@@ -37,28 +73,150 @@ def search_issues(jira_url: str, auth: HTTPBasicAuth, jql: str, fields: list, ma
         jql: JQL query string
         fields: List of fields
         max_results: Maximum number of results
+        next_page_token: Token of the page to fetch (from the previous response)
     
     Returns:
         Dictionary with search results
     """
     # Use the correct API v3 endpoint: /rest/api/3/search/jql
     url = f"{jira_url}/rest/api/3/search/jql"
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
     
     # Use POST instead of GET for better JQL support
     payload = {
         "jql": jql,
-        "fields": fields,
-        "maxResults": max_results
+        "fields": list(fields),
+        "maxResults": max_results,
+        # Keep the response to the listed fields: field ids as keys, no entity properties
+        "fieldsByKeys": False,
+        "properties": []
     }
+    if next_page_token:
+        payload["nextPageToken"] = next_page_token
+    # Encode the body once; the adapter re-sends it as is on retries
+    body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode('utf-8')
     
-    response = requests.post(url, headers=headers, auth=auth, json=payload)
+    # Revalidate a previously seen single-page result instead of downloading it again; a page
+    # with a nextPageToken is never cached, since the token changes between runs and the
+    # first page's ETag says nothing about the pages after it
+    use_cache = RESPONSE_CACHE_ENABLED and not next_page_token
+    cache_path = get_response_cache_path(jira_url, auth, body) if use_cache else None
+    cached_etag, cached_body = load_response_cache(cache_path) if cache_path else (None, None)
+    headers = {"If-None-Match": cached_etag} if cached_etag else None
+    
+    # 429 and gateway errors are retried by the session adapter (full jitter, Retry-After)
+    response = SESSION.post(url, auth=auth, data=body, headers=headers)
     response.raise_for_status()
     
-    return response.json()
+    if response.status_code == 304 and cached_body is not None:
+        return orjson.loads(cached_body) if orjson is not None else json.loads(cached_body)
+    
+    result = parse_json(response)
+    etag = response.headers.get('ETag')
+    if cache_path and etag and not result.get('nextPageToken'):
+        save_response_cache(cache_path, etag, response.content)
+    
+    return result
+
+
+def get_response_cache_path(jira_url: str, auth: HTTPBasicAuth, body: bytes) -> Path:
+    """Cache file for one single-page search (instance, user and exact request body)"""
+    cache_root = Path(os.getenv('XDG_CACHE_HOME') or Path.home() / '.cache')
+    username = getattr(auth, 'username', '')
+    digest = hashlib.sha1(f"{jira_url}\n{username}\n".encode('utf-8') + body).hexdigest()
+    return cache_root / 'jira_export' / f'{digest}.json'
+
+
+def load_response_cache(cache_path: Path):
+    """Return (etag, raw response body) from the cache file, or (None, None) if there is none"""
+    try:
+        with open(cache_path, 'rb') as f:
+            etag, _, body = f.read().partition(b'\n')
+    except OSError:
+        return None, None
+    
+    if not etag or not body:
+        return None, None
+    return etag.decode('utf-8', 'replace'), body
+
+
+def save_response_cache(cache_path: Path, etag: str, body: bytes):
+    """Store the ETag and raw body of a search response (a cache failure never stops the export)"""
+    try:
+        cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        # Responses hold issue data, so only the owner may read them
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(etag.encode('utf-8') + b'\n' + body)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️  Warning: Could not save response cache {cache_path}: {e}", file=sys.stderr)
+
+
+def iter_issues(jira_url: str, auth: HTTPBasicAuth, jql: str, fields: list, batch_size: int = 100):
+    """
+    Iterate over all issues matching JQL, fetching them page by page
+    
+    /search/jql returns at most one page per request, so a single big request
+    silently truncates the result; follow nextPageToken until the last page.
+    The next page is requested in the background while the current one is consumed.
+    
+    Args:
+        jira_url: Jira instance URL
+        auth: HTTPBasicAuth object
+        jql: JQL query string
+        fields: List of fields
+        batch_size: Number of issues per page
+    
+    Yields:
+        Issue dictionaries in JQL order
+    """
+    # Page tokens are sequential, so pages can't be fetched in parallel;
+    # overlap the next request with processing of the current page instead
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(search_issues, jira_url, auth, jql, fields, batch_size)
+        while future is not None:
+            result = future.result()
+            
+            next_page_token = result.get('nextPageToken')
+            if not next_page_token or result.get('isLast'):
+                future = None
+            else:
+                future = executor.submit(search_issues, jira_url, auth, jql, fields, batch_size, next_page_token)
+            
+            yield from result.get('issues', [])
+
+
+def iter_issues_by_announce_type(jira_url: str, auth: HTTPBasicAuth, jql_filter: str, announce_types: list,
+                                 fields: list):
+    """
+    Iterate over issues of the given Release announce types, one JQL query per type
+    
+    The queries are independent, so they run in parallel (JIRA_ASYNC_WORKERS at a time)
+    and only issues of the requested types are transferred. Issues of a multi-select field that match
+    several types are yielded once.
+    
+    Args:
+        jira_url: Jira instance URL
+        auth: HTTPBasicAuth object
+        jql_filter: JQL condition without ORDER BY
+        announce_types: Release announce type values to fetch
+        fields: List of fields
+    
+    Yields:
+        Issue dictionaries, grouped in announce_types order
+    """
+    def fetch(announce_type):
+        jql = f'{jql_filter} AND cf[11823] = "{announce_type}" ORDER BY key ASC'
+        return list(iter_issues(jira_url, auth, jql, fields))
+    
+    seen_keys = set()
+    with ThreadPoolExecutor(max_workers=min(len(announce_types), get_async_workers())) as executor:
+        for issues in executor.map(fetch, announce_types):
+            for issue in issues:
+                if issue['key'] not in seen_keys:
+                    seen_keys.add(issue['key'])
+                    yield issue
 
 
 def parse_adf_to_text(adf_content: Dict[str, Any]) -> str:
@@ -74,23 +232,28 @@ def parse_adf_to_text(adf_content: Dict[str, Any]) -> str:
     if not adf_content or not isinstance(adf_content, dict):
         return ""
 
+    # Empty fields usually arrive as {"type": "doc", "version": 1, "content": []}
+    if not adf_content.get('content') and adf_content.get('type') != 'text':
+        return ""
+
     text_parts = []
 
-    def extract_text(node):
+    # Depth-first walk with an explicit stack (no recursion limit on deep documents);
+    # children are pushed reversed so text comes out in document order
+    stack = deque([adf_content])
+    while stack:
+        node = stack.pop()
         if isinstance(node, dict):
             # If it's a text node, extract the text
             if node.get('type') == 'text':
                 text_parts.append(node.get('text', ''))
 
-            # Recursively process content
-            if 'content' in node:
-                for child in node['content']:
-                    extract_text(child)
+            content = node.get('content')
+            if content:
+                stack.extend(reversed(content))
         elif isinstance(node, list):
-            for item in node:
-                extract_text(item)
+            stack.extend(reversed(node))
 
-    extract_text(adf_content)
     return ' '.join(text_parts).strip()
 
 
@@ -104,56 +267,45 @@ def get_service_group(component_name: str) -> str:
     Returns:
         Group name: 'GP', 'Jackpot system', 'SPE system', or 'Replay system'
     """
-    if component_name.startswith('jackpot-'):
-        return 'Jackpot system'
-    elif component_name.startswith('spe-'):
-        return 'SPE system'
-    elif component_name.startswith('replay-'):
-        return 'Replay system'
+    # One hash lookup on the part before the first '-' instead of a startswith chain
+    dash = component_name.find('-')
+    if dash > 0:
+        return SERVICE_GROUP_BY_PREFIX.get(component_name[:dash], 'GP')
+    return 'GP'
+
+
+def write_json_file(output_file: str, data: Dict[str, Any]):
+    """
+    Write data as indented JSON in one write, replacing output_file atomically
+    
+    The JSON goes to a temporary file next to output_file first, so an interrupted
+    run never leaves a truncated export behind.
+    """
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
     else:
-        return 'GP'
+        content = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, output_file)
 
 
-def export_issues_by_version(project_key: str, fix_version: str, output_file: str = None) -> Dict[str, Any]:
+def group_issues(issues) -> Dict[str, Any]:
     """
-    Export Jira issues by fixVersion to JSON grouped by Release announce type
+    Group issues by Release announce type and collect their components by service group
     
     Args:
-        project_key: Jira project key (e.g., 'PROJ')
-        fix_version: Fix version name (e.g., '1.0.0')
-        output_file: Optional output file path (default: release_notes_{version}.json)
+        issues: Iterable of Jira issues (consumed once, e.g. straight from iter_issues)
     
     Returns:
-        Dictionary with issues grouped by Release announce type and list of components
+        Export structure: issues by Release announce type, short_descriptions, services, all_components
     """
-    jira_url, username, token = get_jira_credentials()
-    auth = HTTPBasicAuth(username, token)
-    
-    # JQL query to find issues
-    jql = f'project = {project_key} AND fixVersion = "{fix_version}" ORDER BY key ASC'
-    
-    print(f"Searching for issues with JQL: {jql}")
-    print(f"Using API endpoint: {jira_url}/rest/api/3/search/jql")
-    
-    # Search issues with specific fields including Release announce type (customfield_11823) and Short description (customfield_14958)
-    fields_to_fetch = ["key", "summary", "components", "customfield_11823", "customfield_14958"]
-    
-    try:
-        result = search_issues(jira_url, auth, jql, fields_to_fetch)
-        issues = result.get('issues', [])
-        
-        print(f"Found {len(issues)} issues (Total: {result.get('total', 0)})")
-        
-    except requests.exceptions.HTTPError as e:
-        print(f"HTTP Error: {e}")
-        print(f"Response: {e.response.text}")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error: {e}")
-        sys.exit(1)
-    
     # Group issues by Release announce type and collect all components
-    grouped_data = {}
+    grouped_data = defaultdict(list)
     all_components = set()
     ungrouped_count = 0
 
@@ -166,68 +318,81 @@ def export_issues_by_version(project_key: str, fix_version: str, output_file: st
     }
 
     # Group short descriptions by release announce type
-    short_descriptions_by_announce_type = {}
+    short_descriptions_by_announce_type = defaultdict(list)
 
-    for issue in issues:
-        # Extract components
-        components = [comp['name'] for comp in issue['fields'].get('components', [])]
-        all_components.update(components)
+    # Local bindings for the per-issue loop
+    add_components = all_components.update
+    format_issue_line = ISSUE_LINE_FORMAT.__mod__
+    issues_count = 0
+
+    # Issues are grouped page by page as they arrive, never held all at once
+    try:
+        for issues_count, issue in enumerate(issues, 1):
+            issue_key = issue['key']
+            fields = issue['fields']
+            get_field = fields.get
 
-        # Classify components by service group
-        for component in components:
-            group = get_service_group(component)
-            service_groups[group].add(component)
+            # Extract components
+            add_components(comp['name'] for comp in get_field('components') or ())
 
-        # Get Release announce type value (customfield_11823)
-        announce_type_field = issue['fields'].get('customfield_11823')
+            # Get Release announce type value (customfield_11823)
+            announce_type_field = get_field('customfield_11823')
         
-        # Determine group name based on Release announce type
-        if announce_type_field:
-            # Handle different field types (single select, multi-select, etc.)
-            if isinstance(announce_type_field, dict):
-                group_name = announce_type_field.get('value', announce_type_field.get('name', 'Other'))
-            elif isinstance(announce_type_field, list) and len(announce_type_field) > 0:
-                if isinstance(announce_type_field[0], dict):
-                    group_name = announce_type_field[0].get('value', announce_type_field[0].get('name', 'Other'))
+            # Determine group name based on Release announce type
+            if announce_type_field:
+                # Handle different field types (single select, multi-select, etc.); the name is
+                # a JSON key, and orjson rejects non-str keys such as {"value": null}
+                if isinstance(announce_type_field, dict):
+                    group_name = str(announce_type_field.get('value', announce_type_field.get('name', 'Other')))
+                elif isinstance(announce_type_field, list) and len(announce_type_field) > 0:
+                    if isinstance(announce_type_field[0], dict):
+                        group_name = str(announce_type_field[0].get('value', announce_type_field[0].get('name', 'Other')))
+                    else:
+                        group_name = str(announce_type_field[0])
                 else:
-                    group_name = str(announce_type_field[0])
+                    group_name = str(announce_type_field)
             else:
-                group_name = str(announce_type_field)
-        else:
-            group_name = "No announce type"
-            ungrouped_count += 1
-        
-        # Initialize group if not exists
-        if group_name not in grouped_data:
-            grouped_data[group_name] = []
-
-        # Add issue to group
-        grouped_data[group_name].append(f"{issue['key']} - {issue['fields']['summary']}")
-
-        # Get Short description (customfield_14958) and add to the same group
-        short_description_raw = issue['fields'].get('customfield_14958')
-        if short_description_raw:
-            # Parse ADF format to plain text
-            if isinstance(short_description_raw, dict):
-                short_description = parse_adf_to_text(short_description_raw)
-            else:
-                short_description = str(short_description_raw)
+                group_name = "No announce type"
+                ungrouped_count += 1
+
+            # Add issue to group
+            grouped_data[group_name].append(format_issue_line((issue_key, fields['summary'])))
+
+            # Get Short description (customfield_14958) and add to the same group
+            short_description_raw = get_field('customfield_14958')
+            if short_description_raw:
+                # Parse ADF format to plain text
+                if isinstance(short_description_raw, dict):
+                    short_description = parse_adf_to_text(short_description_raw)
+                else:
+                    short_description = str(short_description_raw)
+
+                if short_description:
+                    # Add short description to the same announce type group (same format as issues)
+                    short_descriptions_by_announce_type[group_name].append(
+                        format_issue_line((issue_key, short_description))
+                    )
+    except requests.exceptions.HTTPError as e:
+        print(f"HTTP Error: {e}")
+        print(f"Response: {e.response.text}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-            if short_description:
-                # Initialize short descriptions group if not exists
-                if group_name not in short_descriptions_by_announce_type:
-                    short_descriptions_by_announce_type[group_name] = []
+    print(f"Found {issues_count} issues")
 
-                # Add short description to the same announce type group (same format as issues)
-                short_descriptions_by_announce_type[group_name].append(
-                    f"{issue['key']} - {short_description}"
-                )
+    # Classify components by service group (once per unique component)
+    for component in all_components:
+        service_groups[get_service_group(component)].add(component)
     
     if ungrouped_count > 0:
         print(f"\n⚠️  Warning: {ungrouped_count} issues without Release announce type")
     
-    # Create final export structure with service groups
-    export_data = grouped_data.copy()
+    # Create final export structure with service groups; grouped_data is not used
+    # afterwards, so extend it in place instead of copying it
+    grouped_data.default_factory = None
+    export_data = grouped_data
 
     # Add short descriptions by release announce type
     if short_descriptions_by_announce_type:
@@ -237,26 +402,151 @@ def export_issues_by_version(project_key: str, fix_version: str, output_file: st
     services_data = {}
     for group_name, components in service_groups.items():
         if components:
-            services_data[group_name] = sorted(list(components))
+            services_data[group_name] = sorted(components)
 
     export_data['services'] = services_data
-    export_data['all_components'] = sorted(list(all_components))
+    export_data['all_components'] = sorted(all_components)
+
+    return export_data
+
+
+def export_issues_by_version(project_key: str, fix_version: str, output_file: str = None,
+                             announce_types: list = None) -> Dict[str, Any]:
+    """
+    Export Jira issues by fixVersion to JSON grouped by Release announce type
+    
+    Args:
+        project_key: Jira project key (e.g., 'PROJ')
+        fix_version: Fix version name (e.g., '1.0.0')
+        output_file: Optional output file path (default: release_notes_{version}.json)
+        announce_types: Optional list of Release announce types to export; when given,
+            Jira filters by type and issues of other types are not fetched at all
+    
+    Returns:
+        Dictionary with issues grouped by Release announce type and list of components
+    """
+    jira_url, username, token = get_jira_credentials()
+    auth = HTTPBasicAuth(username, token)
+    
+    # JQL query to find issues
+    jql_filter = f'project = {project_key} AND fixVersion = "{fix_version}"'
+    jql = f'{jql_filter} ORDER BY key ASC'
+    
+    print(f"Searching for issues with JQL: {jql}")
+    if announce_types:
+        print(f"Release announce types: {', '.join(announce_types)}")
+    print(f"Using API endpoint: {jira_url}/rest/api/3/search/jql")
+    
+    if announce_types:
+        issues = iter_issues_by_announce_type(jira_url, auth, jql_filter, announce_types, EXPORT_FIELDS)
+    else:
+        issues = iter_issues(jira_url, auth, jql, EXPORT_FIELDS)
+
+    export_data = group_issues(issues)
     
     # Set default output file name if not provided
     if not output_file:
-        output_file = f"release_notes_{fix_version.replace('.', '_').replace(' ', '_')}.json"
+        output_file = default_output_file(fix_version)
     
     # Save to JSON file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(export_data, f, indent=2, ensure_ascii=False)
+    write_json_file(output_file, export_data)
 
-    total_issues = sum(len(issues) for key, issues in export_data.items()
-                       if key not in ['services', 'all_components', 'short_descriptions'])
-    print(f"\nExported {total_issues} issues to {output_file}")
+    print(f"\nExported {count_exported_issues(export_data)} issues to {output_file}")
     
     return export_data
 
 
+def export_issues_by_versions(project_key: str, fix_versions: list, output_file: str = None,
+                              announce_types: list = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Export several fixVersions with a single paginated search
+    
+    Issues are fetched once with 'fixVersion IN (...)' and routed locally to every
+    requested version listed in their fixVersions, so each version gets the same
+    export as a separate run would produce.
+    
+    Args:
+        project_key: Jira project key (e.g., 'PROJ')
+        fix_versions: Fix version names (e.g., ['1.0.0', '1.0.1'])
+        output_file: Optional combined output file ({version: export}); by default
+            every version is written to its own release_notes_{version}.json
+        announce_types: Optional list of Release announce types to export
+    
+    Returns:
+        Dictionary of version -> export structure (as returned by export_issues_by_version)
+    """
+    jira_url, username, token = get_jira_credentials()
+    auth = HTTPBasicAuth(username, token)
+    
+    # JQL query to find issues of all versions at once
+    versions_list = ', '.join(f'"{version}"' for version in fix_versions)
+    jql_filter = f'project = {project_key} AND fixVersion IN ({versions_list})'
+    jql = f'{jql_filter} ORDER BY key ASC'
+    
+    print(f"Searching for issues with JQL: {jql}")
+    if announce_types:
+        print(f"Release announce types: {', '.join(announce_types)}")
+    print(f"Using API endpoint: {jira_url}/rest/api/3/search/jql")
+    
+    fields = EXPORT_FIELDS + ("fixVersions",)
+    if announce_types:
+        issues = iter_issues_by_announce_type(jira_url, auth, jql_filter, announce_types, fields)
+    else:
+        issues = iter_issues(jira_url, auth, jql, fields)
+    
+    issues_by_version = {version: [] for version in fix_versions}
+    # JQL matches version names case-insensitively, so route by the casefolded name too
+    versions_by_name = defaultdict(list)
+    for version in issues_by_version:
+        versions_by_name[version.casefold()].append(version)
+    
+    found_issues = False
+    try:
+        for issue in issues:
+            found_issues = True
+            for version in issue['fields'].get('fixVersions') or ():
+                for requested_version in versions_by_name.get((version.get('name') or '').casefold(), ()):
+                    issues_by_version[requested_version].append(issue)
+    except requests.exceptions.HTTPError as e:
+        print(f"HTTP Error: {e}")
+        print(f"Response: {e.response.text}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    export_by_version = {}
+    for version, version_issues in issues_by_version.items():
+        print(f"\nVersion {version}:")
+        if found_issues and not version_issues:
+            print(f"⚠️  Warning: No issues routed to version '{version}', check the version name")
+        export_data = group_issues(version_issues)
+        export_by_version[version] = export_data
+        
+        if not output_file:
+            version_file = default_output_file(version)
+            write_json_file(version_file, export_data)
+            print(f"Exported {count_exported_issues(export_data)} issues to {version_file}")
+    
+    if output_file:
+        write_json_file(output_file, export_by_version)
+        total_issues = sum(count_exported_issues(export_data) for export_data in export_by_version.values())
+        print(f"\nExported {total_issues} issues of {len(export_by_version)} versions to {output_file}")
+    
+    return export_by_version
+
+
+def default_output_file(fix_version: str) -> str:
+    """Default export file name for a fix version"""
+    return f"release_notes_{fix_version.replace('.', '_').replace(' ', '_')}.json"
+
+
+def count_exported_issues(export_data: Dict[str, Any]) -> int:
+    """Number of issues in an export structure (announce type groups only)"""
+    return sum(len(issues) for key, issues in export_data.items()
+               if key not in ['services', 'all_components', 'short_descriptions'])
+
+
 def print_summary(export_data: Dict[str, Any]):
     """Print a brief summary of exported issues"""
     print(f"\n{'='*60}")
@@ -264,9 +554,7 @@ def print_summary(export_data: Dict[str, Any]):
     print(f"{'='*60}")
 
     # Count total issues
-    total_issues = sum(len(issues) for key, issues in export_data.items()
-                       if key not in ['services', 'all_components', 'short_descriptions'])
-    print(f"Total issues: {total_issues}\n")
+    print(f"Total issues: {count_exported_issues(export_data)}\n")
 
     # Print issues by Release announce type
     for group_name, issues in export_data.items():
@@ -297,23 +585,57 @@ def print_summary(export_data: Dict[str, Any]):
 
 
 if __name__ == '__main__':
-    if len(sys.argv) < 3:
-        print("Usage: python jira_export_v3_fixed.py <PROJECT_KEY> <FIX_VERSION> [output_file.json]")
+    args = sys.argv[1:]
+    
+    # Optional --no-cache: always download search pages, even if they are unchanged
+    if '--no-cache' in args:
+        args.remove('--no-cache')
+        RESPONSE_CACHE_ENABLED = False
+    
+    # Optional --groups "Type A,Type B": export only these Release announce types
+    groups = None
+    if '--groups' in args:
+        index = args.index('--groups')
+        if index + 1 < len(args):
+            groups = [group.strip() for group in args[index + 1].split(',') if group.strip()]
+        del args[index:index + 2]
+    
+    # Optional --versions "1.0.0,1.0.1": export several versions with one search instead of FIX_VERSION
+    versions = None
+    if '--versions' in args:
+        index = args.index('--versions')
+        if index + 1 < len(args):
+            versions = list(dict.fromkeys(version.strip() for version in args[index + 1].split(',') if version.strip()))
+        del args[index:index + 2]
+    
+    # With --versions the positional arguments are <PROJECT_KEY> [output_file.json]
+    output_index = 1 if versions is not None else 2
+    
+    if len(args) < output_index or versions == []:
+        print("Usage: python jira_export_v3_fixed.py <PROJECT_KEY> <FIX_VERSION> [output_file.json] [--groups TYPE1,TYPE2] [--no-cache]")
+        print("       python jira_export_v3_fixed.py <PROJECT_KEY> --versions V1,V2 [output_file.json] [--groups TYPE1,TYPE2] [--no-cache]")
         print("\nExample: python jira_export_v3_fixed.py PROJ 1.0.0")
         print("         python jira_export_v3_fixed.py PROJ '1.0.0' my_release_notes.json")
+        print("         python jira_export_v3_fixed.py PROJ 1.0.0 --groups 'New Feature,Bug Fix'")
+        print("         python jira_export_v3_fixed.py PROJ --versions 1.0.0,1.0.1   (one search, one file per version)")
         print("\nEnvironment variables required:")
         print("  JIRA_URL - Your Jira instance URL (e.g., https://your-domain.atlassian.net)")
         print("  JIRA_USERNAME - Your Jira username/email")
         print("  JIRA_API_TOKEN - Your Jira API token")
         sys.exit(1)
     
-    project = sys.argv[1]
-    version = sys.argv[2]
-    output = sys.argv[3] if len(sys.argv) > 3 else None
+    project = args[0]
+    output = args[output_index] if len(args) > output_index else None
     
     try:
-        issues = export_issues_by_version(project, version, output)
-        print_summary(issues)
+        if versions:
+            exports = export_issues_by_versions(project, versions, output, groups)
+            for version, issues in exports.items():
+                print(f"\nVERSION {version}")
+                print_summary(issues)
+        else:
+            issues = export_issues_by_version(project, args[1], output, groups)
+            print_summary(issues)
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP layer for the Jira scripts
+One pooled, retrying requests.Session per script and JSON decoding helpers
+"""
+
+import random
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FullJitterRetry(Retry):
+    """Retry policy with full jitter: sleep a random time in [0, exponential backoff]"""
+
+    def get_backoff_time(self) -> float:
+        return random.uniform(0, super().get_backoff_time())
+
+
+def create_session(pool_maxsize: int = 16) -> requests.Session:
+    """
+    Create a shared HTTP session so all Jira calls reuse keep-alive connections
+
+    Args:
+        pool_maxsize: Connections kept per host; must cover the number of threads
+            using the session, otherwise extra connections are discarded
+
+    Returns:
+        Session with JSON headers and retries on 429/502/503/504
+    """
+    session = requests.Session()
+    session.headers.update({
+        "Accept": "application/json",
+        # gzip/deflate, plus br/zstd when a decoder for them is installed
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Content-Type": "application/json"
+    })
+    # Jira Cloud throttles with 429 + Retry-After; transient gateway errors are retried too
+    retry = FullJitterRetry(
+        total=5,
+        backoff_factor=1.0,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=8, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_json(response: requests.Response):
+    """Decode a JSON response body, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
@@ -0,0 +1,55 @@
+"""
+Тесты find_service_on_prods.py (запуск: python -m pytest test_find_service_on_prods.py)
+"""
+
+import sys
+
+import pytest
+
+import find_service_on_prods
+from find_service_on_prods import ServiceFinder
+
+
+GOOD_PROD = """services:
+  api-gateway:
+    image: api-gateway:1.0
+"""
+
+
+def test_read_error_is_not_cached_when_scanning_dot(tmp_path, monkeypatch, capsys):
+    """Файл с ошибкой чтения не попадает в кэш и при сканировании '.' (ключи './b.yml')."""
+    prods = tmp_path / 'prods'
+    prods.mkdir()
+    (prods / 'a.yml').write_text(GOOD_PROD)
+    (prods / 'b.yml').write_text(GOOD_PROD)
+    monkeypatch.chdir(prods)
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+
+    parse_services = find_service_on_prods.parse_services
+
+    def failing_parse(file_path, required=None):
+        if file_path.name == 'b.yml':
+            return [], 'Permission denied'
+        return parse_services(file_path, required)
+
+    monkeypatch.setattr(find_service_on_prods, 'parse_services', failing_parse)
+
+    for _ in range(2):
+        finder = ServiceFinder('.')
+        finder.scan_directory()
+        assert 'Ошибка при чтении b.yml' in capsys.readouterr().err
+        assert set(finder.prods_by_service) == {'a'}
+
+
+@pytest.mark.parametrize('value', ['0', '-3', 'abc'])
+def test_top_rejects_non_positive_values(value, monkeypatch, capsys):
+    """--top принимает только целые числа больше нуля."""
+    monkeypatch.setattr(sys, 'argv', ['find_service_on_prods.py', '.', '--top', value])
+    with pytest.raises(SystemExit):
+        find_service_on_prods.parse_arguments()
+    assert '--top' in capsys.readouterr().err
+
+
+def test_top_accepts_positive_value(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['find_service_on_prods.py', '.', '--top', '5'])
+    assert find_service_on_prods.parse_arguments().top == 5
@@ -5,9 +5,14 @@ Test different JQL queries to find issues with specific version
 
 import os
 import sys
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from requests.auth import HTTPBasicAuth
 
+from jira_http import create_session
+
+
+SESSION = create_session()
+
 
 def get_jira_credentials():
     """Get Jira credentials from environment variables"""
@@ -25,10 +30,6 @@ def get_jira_credentials():
 def search_jql(jira_url: str, auth: HTTPBasicAuth, jql: str):
     """Search using JQL"""
     url = f"{jira_url}/rest/api/3/search/jql"
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
     
     payload = {
         "jql": jql,
@@ -36,7 +37,7 @@ def search_jql(jira_url: str, auth: HTTPBasicAuth, jql: str):
         "fields": ["key", "summary", "fixVersions", "project"]
     }
     
-    response = requests.post(url, headers=headers, auth=auth, json=payload)
+    response = SESSION.post(url, auth=auth, json=payload)
     return response
 
 
@@ -74,12 +75,24 @@ def main():
         f'project = {project} AND updated >= -30d',
     ]
     
-    for i, jql in enumerate(queries, 1):
+    # The queries are independent, so send them all at once and print in order
+    def run_query(jql):
+        try:
+            return search_jql(jira_url, auth, jql)
+        except Exception as e:
+            return e
+    
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        responses = list(executor.map(run_query, queries))
+    
+    for i, (jql, response) in enumerate(zip(queries, responses), 1):
         print(f"\n{i}. JQL: {jql}")
         
+        if isinstance(response, Exception):
+            print(f"   ❌ Exception: {response}")
+            continue
+        
         try:
-            response = search_jql(jira_url, auth, jql)
-            
             if response.status_code == 200:
                 data = response.json()
                 total = data.get('total', 0)